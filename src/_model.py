@@ -0,0 +1,72 @@
+import numpy as np
+import os
+import torch
+
+from functools import lru_cache
+from sentence_transformers import SentenceTransformer
+
+# -------------------- On Load --------------------
+
+torch.set_num_threads(max(1, os.cpu_count() or 1))
+torch.set_grad_enabled(False)
+
+_CACHE_SIZE = 100_000
+_BATCH_SIZE = 64
+_embedding_cache: dict[str, np.ndarray] = {}
+
+
+# -------------------- Model --------------------
+
+@lru_cache(maxsize = 1)
+def get_model() -> SentenceTransformer:
+    """
+    Shared all-MiniLM-L6-v2 instance, loaded once per process:
+    int8-quantized ONNX graph on CPU, fp16 ONNX graph on CUDA.
+    """
+    if torch.cuda.is_available():
+        return SentenceTransformer(
+            "all-MiniLM-L6-v2",
+            backend = "onnx",
+            model_kwargs = {"file_name": "onnx/model_O4.onnx", "provider": "CUDAExecutionProvider"},
+        )
+    return SentenceTransformer(
+        "all-MiniLM-L6-v2",
+        backend = "onnx",
+        model_kwargs = {"file_name": "onnx/model_qint8_avx512_vnni.onnx"},
+    )
+
+
+def encode(texts: list[str]) -> np.ndarray:
+    """
+    Normalized embeddings of `texts`, cached across calls.
+    Strings not yet in the cache are encoded together, in batches of similar length.
+    """
+    missing = sorted((t for t in dict.fromkeys(texts) if t not in _embedding_cache), key = len)
+    if missing:
+        emb = np.concatenate([_fast_encode(missing[i:i + _BATCH_SIZE]) for i in range(0, len(missing), _BATCH_SIZE)])
+        _embedding_cache.update(zip(missing, emb))
+
+    embeddings = np.stack([_embedding_cache[t] for t in texts])
+
+    # evict oldest entries
+    while len(_embedding_cache) > _CACHE_SIZE:
+        del _embedding_cache[next(iter(_embedding_cache))]
+
+    return embeddings
+
+
+# -------------------- Helper --------------------
+
+def _fast_encode(texts: list[str]) -> np.ndarray:
+    """
+    Normalized embeddings of one batch, calling tokenizer, transformer and
+    mean pooling directly instead of going through model.encode.
+    """
+    model = get_model()
+    batch = model.tokenizer(texts, padding = True, truncation = True, max_length = model.max_seq_length, return_tensors = "pt")
+    batch = batch.to(model.device)
+    with torch.inference_mode():
+        out = model[0].auto_model(**batch)
+        emb = model[1]({"token_embeddings": out.last_hidden_state, "attention_mask": batch["attention_mask"]})["sentence_embedding"]
+        emb = torch.nn.functional.normalize(emb.float(), p = 2, dim = 1)
+    return emb.cpu().numpy()
@@ -1,12 +1,15 @@
+import lap
 import numpy as np
 
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from scipy.optimize import linear_sum_assignment
+from _model import encode, get_model
+from numba import njit
 
 # -------------------- On Load --------------------
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+model = get_model()
+
+_OVERLAP_CACHE_SIZE = 10_000
+_overlap_cache: dict[tuple, float] = {}
 
 
 # -------------------- Metrics --------------------
@@ -32,7 +35,7 @@ def semantic_overlap(l1: list, l2: list, threshold: float = 0.85) -> float:
     Compute semantic overlap between two lists of strings by:
       1) encoding with SentenceTransformer,
       2) cosine similarity matrix,
-      3) Hungarian assignment to maximize total similarity,
+      3) optimal assignment (Jonker-Volgenant) to maximize total similarity,
       4) fraction of assigned pairs whose similarity >= threshold,
          normalized by the size of the smaller list.
     """
@@ -44,22 +47,61 @@ def semantic_overlap(l1: list, l2: list, threshold: float = 0.85) -> float:
         return 1.0
     if not l1 or not l2:
         return 0.0
-    # if model is None:
-    #     model = SentenceTransformer("all-MiniLM-L6-v2")
 
-    # embeddings
-    emb1 = model.encode(l1)
-    emb2 = model.encode(l2)
+    # memoized result (key is order-independent within and across the two lists)
+    key = (*sorted((frozenset(l1), frozenset(l2)), key = lambda s: (len(s), sorted(s))), threshold)
+    if key in _overlap_cache:
+        return _overlap_cache[key]
 
-    # cosine similarity matrix
-    similarity_matrix = cosine_similarity(emb1, emb2)
+    # embeddings (unit length), both lists in one batch
+    emb = encode(l1 + l2)
+    emb1, emb2 = emb[:len(l1)], emb[len(l1):]
 
-    # hungarian method
-    cost_matrix = 1 - similarity_matrix
-    row_idx, col_idx = linear_sum_assignment(cost_matrix)
-    matches = sum(similarity_matrix[i, j] >= threshold for i, j in zip(row_idx, col_idx))
+    # cosine similarity matrix (single GEMM, no re-normalization)
+    similarity_matrix = emb1 @ emb2.T
+    overlap = _matched_fraction(similarity_matrix, threshold)
+
+    # evict oldest entry
+    _overlap_cache[key] = overlap
+    if len(_overlap_cache) > _OVERLAP_CACHE_SIZE:
+        del _overlap_cache[next(iter(_overlap_cache))]
+
+    return overlap
+
+
+def semantic_overlap_matrix(lists: list[list], threshold: float = 0.85) -> np.ndarray:
+    """
+    Compute semantic_overlap for every pair of lists at once.
+    All unique strings are encoded in one batch and compared with a single
+    similarity matrix; each pair then only slices its sub-matrix.
+    Returns a symmetric (n×n) array with entry [i, j] = semantic_overlap(lists[i], lists[j]).
+    """
+    # deduplicate
+    lists = [list(dict.fromkeys(lst)) for lst in lists]
     
-    return matches / min(len(l1), len(l2))
+    # encode the union once
+    uniques = list(dict.fromkeys(s for lst in lists for s in lst))
+    index = {s: i for i, s in enumerate(uniques)}
+    if uniques:
+        emb = encode(uniques)
+        similarity_matrix = emb @ emb.T
+    
+    n = len(lists)
+    overlap_matrix = np.zeros((n, n), dtype = float)
+    idx = [np.array([index[s] for s in lst], dtype = np.int64) for lst in lists]
+    
+    for i in range(n):
+        for j in range(i, n):
+            if not len(idx[i]) and not len(idx[j]):
+                overlap = 1.0
+            elif not len(idx[i]) or not len(idx[j]):
+                overlap = 0.0
+            else:
+                overlap = _matched_fraction(similarity_matrix[np.ix_(idx[i], idx[j])], threshold)
+            overlap_matrix[i, j] = overlap
+            overlap_matrix[j, i] = overlap
+    
+    return overlap_matrix
 
 
 def extrapolated_rbo(l1: list, l2: list, p = 0.9):
@@ -69,38 +111,108 @@ def extrapolated_rbo(l1: list, l2: list, p = 0.9):
     - l2: Second ranked list
     - p: Probability parameter (default 0.9), controls weight of top ranks
     """
-    # Get all items up to a given depth
-    def set_at_depth(lst, depth):
-        ans = set()
-        for v in lst[:depth]:
-            if isinstance(v, set):
-                ans.update(v)
-            else:
-                ans.add(v)
-        return ans
+    # identical rankings (including two empty lists)
+    if l1 == l2:
+        return 1.0
     
-    # Calculate agreement (proportion of shared items) at given depth
-    def agreement(depth):
-        set1 = set_at_depth(l1, depth)
-        set2 = set_at_depth(l2, depth)
-        len_intersection = len(set1.intersection(set2))
-        return 2 * len_intersection / (len(set1) + len(set2))
+    (ids1, offsets1), (ids2, offsets2), n_ids = _ranked_ids(l1, l2)
     
-    # Calculate overlap (count of shared items) at given depth
-    def overlap(depth):
-        return agreement(depth) * min(depth, len(l1), len(l2))
+    # no shared items (including one empty list)
+    if not np.isin(ids1, ids2).any():
+        return 0.0
     
     # Main calculation
     S, L = sorted((l1, l2), key = len)
     s, l = len(S), len(L)
     
-    x_l = overlap(l)
-    x_s = overlap(s)
+    sum1, agreement_s, agreement_l = _rbo_agreements(ids1, offsets1, ids2, offsets2, n_ids, s, l, p)
     
-    sum1 = sum(p ** d * agreement(d) for d in range(1, l + 1))
-    sum2 = sum(p ** d * x_s * (d - s) / s / d for d in range(s + 1, l + 1))
+    # overlap (count of shared items) at depth l and s
+    x_l = agreement_l * s
+    x_s = agreement_s * s
+    
+    d = np.arange(s + 1, l + 1)
+    sum2 = x_s * np.dot(np.power(p, d), (d - s) / s / d)
     
     term1 = (1 - p) / p * (sum1 + sum2)
     term2 = p ** l * ((x_l - x_s) / l + x_s / s)
     
-    return term1 + term2
\ No newline at end of file
+    return term1 + term2
+
+
+# -------------------- Overlap Helper --------------------
+
+def _matched_fraction(similarity_matrix: np.ndarray, threshold: float) -> float:
+    """
+    Optimal assignment (Jonker-Volgenant, padded internally for rectangular
+    matrices), then the fraction of assigned pairs with similarity >= threshold,
+    normalized by the size of the smaller list.
+    """
+    cost_matrix = 1 - similarity_matrix
+    _, row_to_col, _ = lap.lapjv(cost_matrix, extend_cost = True)
+    row_idx = np.flatnonzero(row_to_col >= 0)
+    col_idx = row_to_col[row_idx]
+    matches = int((similarity_matrix[row_idx, col_idx] >= threshold).sum())
+    
+    return matches / min(similarity_matrix.shape)
+
+
+# -------------------- RBO Helper --------------------
+
+def _ranked_ids(l1: list, l2: list):
+    """
+    Map the items of both ranked lists to shared integer ids.
+    Each list becomes a flat id array plus rank offsets, so that rank r
+    holds ids[offsets[r]:offsets[r + 1]] (ties are given as sets).
+    """
+    ids = {}
+    ranked = []
+    for lst in (l1, l2):
+        flat, offsets = [], [0]
+        for v in lst:
+            for item in (v if isinstance(v, set) else (v,)):
+                flat.append(ids.setdefault(item, len(ids)))
+            offsets.append(len(flat))
+        ranked.append((np.array(flat, dtype = np.int64), np.array(offsets, dtype = np.int64)))
+    return ranked[0], ranked[1], len(ids)
+
+
+@njit(cache = True)
+def _rbo_agreements(ids1, offsets1, ids2, offsets2, n_ids, s, l, p):
+    """
+    Walk both lists once, keeping the sizes of the prefix sets and of their
+    intersection up to date. Returns sum of p**d * agreement(d) for d = 1..l
+    together with the agreement at depths s and l.
+    """
+    seen1 = np.zeros(n_ids, dtype = np.bool_)
+    seen2 = np.zeros(n_ids, dtype = np.bool_)
+    size1, size2, intersection = 0, 0, 0
+    
+    sum1, p_d = 0.0, 1.0
+    agreement, agreement_s = 0.0, 0.0
+    for d in range(1, l + 1):
+        if d < len(offsets1):
+            for k in range(offsets1[d - 1], offsets1[d]):
+                v = ids1[k]
+                if not seen1[v]:
+                    seen1[v] = True
+                    size1 += 1
+                    if seen2[v]:
+                        intersection += 1
+        if d < len(offsets2):
+            for k in range(offsets2[d - 1], offsets2[d]):
+                v = ids2[k]
+                if not seen2[v]:
+                    seen2[v] = True
+                    size2 += 1
+                    if seen1[v]:
+                        intersection += 1
+        
+        # agreement (proportion of shared items) at depth d
+        agreement = 2 * intersection / (size1 + size2)
+        p_d *= p
+        sum1 += p_d * agreement
+        if d == s:
+            agreement_s = agreement
+    
+    return sum1, agreement_s, agreement
\ No newline at end of file
@@ -1,12 +1,21 @@
 import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
 import seaborn as sns
 import pandas as pd
 import numpy as np
+from colorsys import rgb_to_hls
 from scipy.stats import mannwhitneyu
 from itertools import combinations
 
+# -------------------- On Load --------------------
+
+# boxplot theme, resolved once (same rc as sns.set(style = "whitegrid", font_scale = 1.6))
+_BOXPLOT_RC = {**sns.axes_style("whitegrid"), **sns.plotting_context("notebook", font_scale = 1.6)}
+
+
 # -------------------- Plots --------------------
 
+@plt.rc_context(_BOXPLOT_RC)
 def boxplot(
     df: pd.DataFrame,
     x_col: str,
@@ -94,8 +103,6 @@ def boxplot(
     P-values are calculated using Mann-Whitney U test with Bonferroni correction
     for multiple comparisons.
     """
-    sns.set(style = "whitegrid", font_scale = 1.6)
-    
     # determine category order
     if order is None:
         order = list(pd.Index(df[x_col]).astype("category").cat.categories) \
@@ -111,35 +118,45 @@ def boxplot(
         else:
             palette = palette[:len(order)]
     
+    # values per category, computed once
+    grouped = [df.loc[df[x_col] == cat, y_col].dropna().to_numpy() for cat in order]
+    positions = np.arange(len(order))
+    
+    # gray line color derived from the palette (as seaborn does)
+    lum = min(rgb_to_hls(*mcolors.to_rgb(c))[1] for c in palette) * .6
+    line_color = (lum, lum, lum)
+    line_props = {"color": line_color, "linewidth": 1.25}
+    
     fig, ax = plt.subplots(figsize = figsize)
     
     # boxplot 
-    sns.boxplot(
-        data = df,
-        x = x_col,
-        y = y_col,
-        hue = x_col,
-        order = order,
-        palette = palette,
-        width = box_width,
+    boxes = ax.boxplot(
+        grouped,
+        positions = positions,
+        widths = box_width,
         showfliers = showfliers,
-        legend = False,
-        ax = ax,
+        patch_artist = True,
+        boxprops = {"edgecolor": line_color, "linewidth": 1.25},
+        whiskerprops = line_props,
+        capprops = line_props,
+        medianprops = line_props,
+        flierprops = {"markeredgecolor": line_color},
     )
+    for box, color in zip(boxes["boxes"], palette):
+        box.set_facecolor(color)
     
     # optional points
     if add_points:
-        sns.stripplot(
-            data = df,
-            x = x_col,
-            y = y_col,
-            order = order,
-            color = point_color,
-            alpha = point_alpha,
-            jitter = point_jitter,
-            size = point_size,
-            ax = ax,
-        )
+        rng = np.random.default_rng()
+        for i, vals in zip(positions, grouped):
+            x = rng.uniform(i - 0.1, i + 0.1, len(vals)) if point_jitter else np.full(len(vals), i)
+            ax.scatter(x, vals, s = point_size ** 2, color = point_color, alpha = point_alpha,
+                       linewidths = 0, zorder = 3)
+    
+    ax.set_xticks(positions)
+    ax.set_xticklabels(order)
+    ax.set_xlim(-0.5, len(order) - 0.5)
+    ax.xaxis.grid(False)
     
     # labels
     ax.set_xlabel(xlabel if xlabel is not None else x_col, fontsize = 18)
@@ -168,8 +185,8 @@ def boxplot(
         # calculate pairwise p-values
         pvalue_data = []
         for cat1, cat2 in combinations(order, 2):
-            group1 = df[df[x_col] == cat1][y_col].dropna()
-            group2 = df[df[x_col] == cat2][y_col].dropna()
+            group1 = grouped[order.index(cat1)]
+            group2 = grouped[order.index(cat2)]
             
             if len(group1) > 0 and len(group2) > 0:
                 _, p_raw = mannwhitneyu(group1, group2, alternative = "two-sided")
@@ -1,10 +1,12 @@
 from collections import Counter
-from sentence_transformers import SentenceTransformer, util
-import torch
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from _model import encode, get_model
+import numpy as np
 
 # -------------------- On Load --------------------
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+model = get_model()
 
 
 # -------------------- Function --------------------
@@ -13,53 +15,37 @@ def top_n_semantic_products(list_of_product_lists: list[list[str]], top_n: int =
     """
     Get top-N products by semantic similarity and frequency across lists.
     """
-    # Get unique items while preserving order
-    seen, items = set(), []
+    # Count occurrences and get unique items (insertion order) in one pass
+    counts = Counter()
     for lst in list_of_product_lists:
         for p in lst:
-            if p not in seen:
-                seen.add(p)
-                items.append(p)
+            counts[p] += 1
+    items = list(counts)
     
     if not items:
         return []
     
-    # Count occurrences
-    counts = Counter(p for lst in list_of_product_lists for p in lst)
+    # Encode all items (cached, unit length)
+    embeddings = encode(items)
     
-    # Encode all items
-    with torch.no_grad():
-        embeddings = model.encode(items, normalize_embeddings=True, convert_to_tensor=True)
+    # Pairwise cosine similarities
+    sims = embeddings @ embeddings.T
     
-    # Group similar items using better clustering
-    assigned = [False] * len(items)
-    groups = []
+    # Group similar items: connected components of the thresholded similarity graph
+    adjacency = csr_matrix(sims >= threshold)
+    n_groups, labels = connected_components(adjacency, directed=False)
+    groups = [np.flatnonzero(labels == c).tolist() for c in range(n_groups)]
     
-    for i in range(len(items)):
-        if assigned[i]:
-            continue
-        
-        group = [i]
-        assigned[i] = True
-        
-        # Find all similar items to any item in the group
-        for j in range(i + 1, len(items)):
-            if not assigned[j]:
-                # Check similarity to all items in group, use max
-                max_sim = max(float(util.cos_sim(embeddings[j], embeddings[idx])) for idx in group)
-                if max_sim >= threshold:
-                    group.append(j)
-                    assigned[j] = True
-        
-        groups.append(group)
+    # Similarity of each item to the rest of its group, and total count per group
+    centrality = np.where(labels[:, None] == labels[None, :], sims, 0).sum(axis=1)
+    group_counts = np.bincount(labels, weights=[counts[p] for p in items])
     
     # Pick best representative from each group
     results = []
-    for group in groups:
+    for c, group in enumerate(groups):
         # Use item that is most similar to others in group (centroid-like)
-        best_idx = max(group, key=lambda idx: sum(float(util.cos_sim(embeddings[idx], embeddings[jdx])) for jdx in group))
-        count = sum(counts[items[idx]] for idx in group)
-        results.append((items[best_idx], count))
+        best_idx = group[int(centrality[group].argmax())]
+        results.append((items[best_idx], int(group_counts[c])))
     
     # Sort by frequency
     results.sort(key=lambda x: -x[1])